@@ -14,15 +14,17 @@ It allows you to:
 import os
 import json
 import streamlit as st
-from dotenv import load_dotenv
 
 
+from utils.config import load_config
+from utils.storage import articles_store
+from utils.history_index import history_index
 from tools.search_tool import get_trending_topics
 from tools.fetch_tool import fetch_article_content
 from tools.post_gen_tool import generate_linkedin_post
 from tools.linkedin_tool import post_to_linkedin
 
-load_dotenv()
+load_config()
 
 st.set_page_config(page_title="PulsePost - LinkedIn Auto MVP", layout="wide")
 st.title("🤖 PulsePost")
@@ -58,8 +60,10 @@ if fetch_btn:
 topics = st.session_state.get("topics", [])
 if topics:
     st.subheader("📈 Trending Topics")
+    index = history_index()
     for i, t in enumerate(topics, start=1):
-        st.write(f"**{i}. {t['title']}** — *{t['source']}* ")
+        seen = " · 🔁 posted before" if index.find_repeats(t["title"], t["url"]) else ""
+        st.write(f"**{i}. {t['title']}** — *{t['source']}*{seen}")
 
     idx = st.number_input("Select topic number", min_value=1, max_value=len(topics), value=1)
     selected = topics[idx - 1]
@@ -67,7 +71,13 @@ if topics:
     if st.button("Fetch Content"):
         with st.spinner("Fetching content..."):
             content = fetch_article_content(selected["url"])
-        save_json(os.path.join(DATA_DIR, "extracted_content.json"), content)
+        # Only real extractions go into the history; checked before saving so the article doesn't match itself
+        st.session_state["similar_articles"] = []
+        if content["text"]:
+            st.session_state["similar_articles"] = history_index().near_duplicates(
+                f"{content['title']} {content['text']}", kind="article", exclude_url=content["url"]
+            )
+            articles_store().append(content, url=content["url"])
         st.session_state["content"] = content
         st.success("Article content fetched successfully!")
 
@@ -77,6 +87,8 @@ content = st.session_state.get("content")
 if content:
     st.subheader("📰 Extracted Article Preview")
     st.write(f"### {content['title']}")
+    for similar in st.session_state.get("similar_articles", []):
+        st.warning(f"🔁 Similar to a previously extracted article ({similar['similarity']:.0%}): {similar['title']} — {similar['url']}")
     st.text_area("Article Text (editable)", content["text"], key="article_text", height=600)
 
     if st.button("Generate LinkedIn Post"):
@@ -109,14 +121,16 @@ if post_text:
     with col1:
         if st.button("💾 Save Locally"):
             topic_title = content.get("title") if content else ""
-            post_to_linkedin(post_text, publish=False, metadata={"topic": topic_title})
-            st.success("Saved locally to /data/generated_posts.json")
+            topic_url = content.get("url") if content else None
+            post_to_linkedin(post_text, publish=False, metadata={"topic": topic_title, "url": topic_url})
+            st.success("Saved locally to /data/posts/")
 
     with col2:
         if st.button("🚀 Publish to LinkedIn"):
             with st.spinner("Publishing to LinkedIn..."):
                 topic_title = content.get("title") if content else ""
-                resp = post_to_linkedin(post_text, publish=True, metadata={"topic": topic_title})
+                topic_url = content.get("url") if content else None
+                resp = post_to_linkedin(post_text, publish=True, metadata={"topic": topic_title, "url": topic_url})
             if resp.get("published"):
                 st.success("✅ Successfully posted to LinkedIn!")
             else:
@@ -6,9 +6,12 @@ import json
 import logging
 from rich import print
 from rich.prompt import Prompt
-from dotenv import load_dotenv
 
-load_dotenv()
+from utils.config import load_config
+from utils.storage import articles_store
+from utils.history_index import history_index
+
+load_config()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -41,18 +44,29 @@ def main():
 
     save_json(os.path.join(DATA_DIR, "trending_topics.json"), topics)
 
+    index = history_index()
     for i, t in enumerate(topics, start=1):
-        print(f"{i}. [bold]{t['title']}[/bold] — [cyan]{t['source']}[/cyan]")
+        seen = " [magenta](posted before)[/magenta]" if index.find_repeats(t["title"], t["url"]) else ""
+        print(f"{i}. [bold]{t['title']}[/bold] — [cyan]{t['source']}[/cyan]{seen}")
 
     choice = Prompt.ask("Select topic", choices=[str(i) for i in range(1, len(topics) + 1)])
     selected = topics[int(choice) - 1]
 
     print(f"\nFetching content for: [bold]{selected['title']}[/bold]\n")
     content = fetch_article_content(selected["url"])
-    save_json(os.path.join(DATA_DIR, "extracted_content.json"), content)
-
     article_text = content.get("text") or content.get("title") 
 
+    # Only real extractions go into the history; checked before saving so the article doesn't match itself
+    similar = []
+    if content["text"]:
+        similar = index.near_duplicates(f"{content['title']} {article_text}", kind="article", exclude_url=content["url"])
+        articles_store().append(content, url=content["url"])
+    if similar:
+        best = similar[0]
+        print(f"[yellow]Similar to a previously extracted article ({best['similarity']:.0%}): {best['title']} — {best['url']}[/yellow]")
+        if Prompt.ask("Generate a post anyway?", choices=["y", "n"], default="n") == "n":
+            return
+
     print("Generating LinkedIn post...\n")
     post_text = generate_linkedin_post(article_text=article_text, prompt_path="prompts/post_prompt.txt")    # type: ignore
     print("\n[bold green]--- POST PREVIEW ---[/bold green]\n")
@@ -0,0 +1,222 @@
+"""server.py - Multi-tenant service mode for PulsePost.
+
+A small ASGI app that exposes search/extract/generate/publish as async
+jobs, so one process can serve several LinkedIn accounts at once.
+
+Run with:
+    uvicorn server:app --port 8080
+
+Endpoints (the tenant is taken from the X-Tenant header and must be
+authenticated with `Authorization: Bearer <PULSEPOST_TENANT_KEY_<TENANT>>`):
+    POST /jobs           {"kind": "search|extract|generate|publish", "params": {...}}
+                         (extract takes "url", or "urls" for a batch)
+    GET  /jobs/{id}      job status and result
+    GET  /health         worker pool and queue totals (no tenant needed)
+    GET  /stats          the same, plus the calling tenant's own counts
+
+Per-account LinkedIn credentials are read from
+LINKEDIN_ACCESS_TOKEN_<TENANT> / LINKEDIN_AUTHOR_URN_<TENANT>, where
+<TENANT> is the upper-cased tenant id. Tenant ids are case-insensitive
+and limited to letters, digits and underscores.
+"""
+
+
+import os
+import re
+import hmac
+import json
+import logging
+
+from utils.config import load_config
+from utils.job_queue import JobManager, QueueFullError
+
+load_config()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+PROMPT_PATH = os.path.join(os.path.dirname(__file__), "prompts", "post_prompt.txt")
+MAX_BODY_BYTES = 1_000_000
+# Lower-case letters, digits and underscores only, so every tenant maps to exactly one env suffix
+_TENANT_RE = re.compile(r"^[a-z0-9_]{1,64}$")
+
+
+class BodyTooLarge(Exception):
+    """Raised when a request body exceeds MAX_BODY_BYTES."""
+
+
+def _tenant_env(name: str, tenant: str):
+    return os.getenv(f"{name}_{tenant.upper()}")
+
+
+def _check_params(kind: str, params):
+    """Reject malformed params up front so the client gets a 400, not a failed job."""
+    if params is None:
+        return
+    if not isinstance(params, dict):
+        raise ValueError("params must be a JSON object")
+    urls = params.get("urls")
+    if kind == "extract" and urls is not None:
+        if not isinstance(urls, list) or not urls or not all(isinstance(u, str) and u for u in urls):
+            raise ValueError("urls must be a non-empty list of URL strings")
+
+
+def _run_search(tenant: str, params: dict):
+    from tools.search_tool import get_trending_topics
+    return get_trending_topics(
+        query=params.get("query"),
+        web_limit=int(params.get("web_limit", 5)),
+        reddit_limit=int(params.get("reddit_limit", 5)),
+    )
+
+
+def _run_extract(tenant: str, params: dict):
+    """Extract params["url"], or every url in params["urls"] as one batch."""
+    from tools.fetch_tool import fetch_article_content, fetch_articles
+    from utils.storage import articles_store
+    urls = params.get("urls")
+    contents = fetch_articles(list(urls)) if urls else [fetch_article_content(params.get("url", ""))]
+    for content in contents:
+        if content["text"]:    # failed extractions are returned but not kept in the history
+            articles_store().append(content, url=content["url"])
+    return contents if urls else contents[0]
+
+
+def _run_generate(tenant: str, params: dict):
+    from tools.post_gen_tool import generate_linkedin_post
+    return {"post": generate_linkedin_post(params.get("article_text", ""), prompt_path=PROMPT_PATH)}
+
+
+def _run_publish(tenant: str, params: dict):
+    from tools.linkedin_tool import post_to_linkedin
+    metadata = dict(params.get("metadata") or {})
+    metadata["tenant"] = tenant
+    publish = bool(params.get("publish", False))
+    access_token = _tenant_env("LINKEDIN_ACCESS_TOKEN", tenant)
+    # Never fall back to the global account when publishing for a tenant
+    if publish and not access_token:
+        raise ValueError(f"No LinkedIn credentials configured for tenant {tenant!r}")
+    return post_to_linkedin(
+        params.get("post_text", ""),
+        publish=publish,
+        metadata=metadata,
+        access_token=access_token,
+        author_urn=_tenant_env("LINKEDIN_AUTHOR_URN", tenant),
+    )
+
+
+HANDLERS = {
+    "search": _run_search,
+    "extract": _run_extract,
+    "generate": _run_generate,
+    "publish": _run_publish,
+}
+
+manager = JobManager(
+    HANDLERS,
+    workers=int(os.getenv("PULSEPOST_WORKERS", "4")),
+    per_tenant_limit=int(os.getenv("PULSEPOST_TENANT_CONCURRENCY", "2")),
+    max_pending_per_tenant=int(os.getenv("PULSEPOST_TENANT_QUEUE", "100")),
+)
+
+
+async def _send_json(send, status: int, payload):
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _read_body(receive) -> bytes:
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise BodyTooLarge("Request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await manager.start()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await manager.stop()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    method, path = scope["method"], scope["path"].rstrip("/")
+    headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+
+    if method == "GET" and path == "/health":
+        await _send_json(send, 200, {"status": "ok", **manager.stats()})
+        return
+
+    tenant = headers.get("x-tenant", "").lower()
+    if not _TENANT_RE.match(tenant):
+        await _send_json(send, 400, {"error": "Missing or invalid X-Tenant header"})
+        return
+
+    # Each tenant has its own secret; unknown tenants and wrong keys get the same answer
+    expected = _tenant_env("PULSEPOST_TENANT_KEY", tenant)
+    auth = headers.get("authorization", "")
+    supplied = auth[len("Bearer "):] if auth.startswith("Bearer ") else ""
+    if not expected or not supplied or not hmac.compare_digest(supplied.encode(), expected.encode()):
+        await _send_json(send, 401, {"error": "Missing or invalid tenant credentials"})
+        return
+
+    if method == "POST" and path == "/jobs":
+        try:
+            payload = json.loads(await _read_body(receive) or b"{}")
+            kind, params = payload.get("kind", ""), payload.get("params")
+            _check_params(kind, params)
+            job = await manager.submit(tenant, kind, params)
+        except BodyTooLarge as e:
+            await _send_json(send, 413, {"error": str(e)})
+            return
+        except QueueFullError as e:
+            await _send_json(send, 429, {"error": str(e)})
+            return
+        except (ValueError, AttributeError) as e:
+            await _send_json(send, 400, {"error": str(e)})
+            return
+        await _send_json(send, 202, job.to_dict())
+        return
+
+    if method == "GET" and path == "/stats":
+        await _send_json(send, 200, {"status": "ok", **manager.stats(tenant)})
+        return
+
+    if method == "GET" and path.startswith("/jobs/"):
+        job = manager.get(path[len("/jobs/"):])
+        # Jobs are only visible to the tenant that submitted them
+        if job is None or job.tenant != tenant:
+            await _send_json(send, 404, {"error": "Job not found"})
+            return
+        await _send_json(send, 200, job.to_dict())
+        return
+
+    await _send_json(send, 404, {"error": "Not found"})
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=os.getenv("PULSEPOST_HOST", "127.0.0.1"), port=int(os.getenv("PULSEPOST_PORT", "8080")))
@@ -0,0 +1,364 @@
+"""fetch_scheduler.py
+
+
+Polite, self-tuning HTTP fetching for article extraction.
+
+FetchScheduler keeps per-domain stats in data/domain_stats.json and uses
+them to:
+- size timeouts from the observed p95 latency of each domain,
+- back off from domains that keep failing (paywalls, 403s, timeouts),
+- respect robots.txt (cached per domain for a day under data/robots/),
+- cap concurrent requests per host and retry transient errors.
+
+Stats are written at most every SAVE_INTERVAL seconds, after each batch
+and at exit, so fetch threads don't wait on the file.
+
+Functions:
+get_scheduler() -> FetchScheduler (shared per process)
+host_of(url) -> str
+"""
+
+
+from collections import deque
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+import atexit
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+from utils.config import load_config
+
+if TYPE_CHECKING:
+    from urllib.robotparser import RobotFileParser
+
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+STATS_PATH = os.path.join(DATA_DIR, "domain_stats.json")
+ROBOTS_DIR = os.path.join(DATA_DIR, "robots")
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36 PulsePost/0.1"
+)
+ROBOTS_AGENT = "PulsePost"
+
+DEFAULT_TIMEOUT = 15.0
+MIN_TIMEOUT = 5.0
+MAX_TIMEOUT = 30.0
+CONNECT_TIMEOUT = 5.0
+MIN_SAMPLES = 5
+LATENCY_WINDOW = 50
+
+MAX_RETRIES = 2
+PER_HOST_LIMIT = 2
+MAX_BYTES = 5 * 1024 * 1024
+ROBOTS_TTL = 24 * 3600
+SAVE_INTERVAL = 5.0
+
+# Statuses that mean "this site won't give us the article", not "try again"
+BLOCKING_STATUSES = {401, 402, 403, 451}
+# Dead links: a problem with the URL, not the domain
+URL_STATUSES = {404, 410}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BLOCK_AFTER_BLOCKING = 2
+BLOCK_AFTER_FAILURES = 3
+BASE_COOLDOWN = 10 * 60
+MAX_COOLDOWN = 24 * 3600
+
+
+class FetchSkipped(Exception):
+    """Raised when a URL is not fetched because of robots.txt or a cooled-down domain."""
+
+
+class FetchFailed(Exception):
+    """Raised when a URL could not be fetched after retries."""
+
+
+def host_of(url: str) -> str:
+    """Lower-cased host name of url, the key for per-domain stats and limits."""
+    return (urlsplit(url).hostname or "").lower()
+
+
+class DomainStats:
+    def __init__(self, data: Optional[Dict] = None):
+        data = data or {}
+        self.latencies = deque(data.get("latencies", []), maxlen=LATENCY_WINDOW)
+        self.successes = data.get("successes", 0)
+        self.failures = data.get("failures", 0)
+        self.not_found = data.get("not_found", 0)
+        self.consecutive_failures = data.get("consecutive_failures", 0)
+        self.last_status = data.get("last_status")
+        self.blocked_until = data.get("blocked_until", 0.0)
+
+    def to_dict(self) -> Dict:
+        return {
+            "latencies": [round(x, 3) for x in self.latencies],
+            "successes": self.successes,
+            "failures": self.failures,
+            "not_found": self.not_found,
+            "consecutive_failures": self.consecutive_failures,
+            "last_status": self.last_status,
+            "blocked_until": self.blocked_until,
+        }
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def timeout(self) -> float:
+        p95 = self.p95()
+        if p95 is None:
+            return DEFAULT_TIMEOUT
+        return min(MAX_TIMEOUT, max(MIN_TIMEOUT, p95 * 2 + 1))
+
+    def health(self) -> float:
+        """0..1 success ratio (optimistic for unknown domains), used to order batches."""
+        total = self.successes + self.failures
+        return 1.0 if not total else self.successes / total
+
+
+class FetchScheduler:
+    def __init__(
+        self,
+        stats_path: str = STATS_PATH,
+        user_agent: Optional[str] = None,
+        per_host_limit: int = PER_HOST_LIMIT,
+        robots_dir: str = ROBOTS_DIR,
+    ):
+        load_config()
+        self.stats_path = stats_path
+        self.robots_dir = robots_dir
+        self.user_agent = user_agent or os.getenv("FETCH_USER_AGENT") or DEFAULT_USER_AGENT
+        self.per_host_limit = per_host_limit
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = 0.0
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        # host -> (parser, time the robots.txt body was downloaded)
+        self._robots: Dict[str, Tuple["RobotFileParser", float]] = {}
+        self._stats: Dict[str, DomainStats] = self._load()
+        atexit.register(self.flush)
+
+    # --- persistence ---
+    def _load(self) -> Dict[str, DomainStats]:
+        if not os.path.exists(self.stats_path):
+            return {}
+        try:
+            with open(self.stats_path, "r", encoding="utf-8") as f:
+                return {host: DomainStats(d) for host, d in json.load(f).items()}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Ignoring unreadable domain stats %s: %s", self.stats_path, e)
+            return {}
+
+    def flush(self):
+        """Write stats atomically if they changed since the last write."""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                snapshot = {h: s.to_dict() for h, s in self._stats.items()}
+                self._dirty = False
+                self._saved_at = time.monotonic()
+            # Serialised outside self._lock so fetch threads keep going
+            try:
+                os.makedirs(os.path.dirname(self.stats_path), exist_ok=True)
+                tmp = f"{self.stats_path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(snapshot, f, separators=(",", ":"))
+                os.replace(tmp, self.stats_path)
+            except OSError as e:
+                logger.warning("Could not save domain stats to %s: %s", self.stats_path, e)
+                with self._lock:
+                    self._dirty = True
+
+    def _changed(self):
+        """Mark stats dirty; caller holds self._lock. Returns whether a write is due."""
+        self._dirty = True
+        return time.monotonic() - self._saved_at >= SAVE_INTERVAL
+
+    def stats(self, host: str) -> DomainStats:
+        with self._lock:
+            return self._stats.setdefault(host, DomainStats())
+
+    # --- bookkeeping ---
+    def _record_success(self, host: str, latency: float):
+        with self._lock:
+            s = self._stats.setdefault(host, DomainStats())
+            s.latencies.append(latency)
+            s.successes += 1
+            s.consecutive_failures = 0
+            s.last_status = 200
+            s.blocked_until = 0.0
+            due = self._changed()
+        if due:
+            self.flush()
+
+    def _record_latency(self, host: str, latency: float):
+        """Latency of a failed attempt (e.g. a timeout); counts towards p95 only."""
+        with self._lock:
+            self._stats.setdefault(host, DomainStats()).latencies.append(latency)
+            self._changed()
+
+    def _record_failure(self, host: str, status: Optional[int] = None):
+        """Record one failed fetch() call, however many attempts it took."""
+        with self._lock:
+            s = self._stats.setdefault(host, DomainStats())
+            if status in URL_STATUSES:
+                # Counted separately; never affects domain health or cooldown
+                s.not_found += 1
+            else:
+                s.failures += 1
+                s.consecutive_failures += 1
+                s.last_status = status
+                threshold = BLOCK_AFTER_BLOCKING if status in BLOCKING_STATUSES else BLOCK_AFTER_FAILURES
+                if s.consecutive_failures >= threshold:
+                    cooldown = min(MAX_COOLDOWN, BASE_COOLDOWN * 2 ** (s.consecutive_failures - threshold))
+                    s.blocked_until = time.time() + cooldown
+                    logger.warning("Cooling down %s for %d min after %d failures", host, cooldown // 60, s.consecutive_failures)
+            due = self._changed()
+        if due:
+            self.flush()
+
+    def is_blocked(self, host: str) -> bool:
+        return self.stats(host).blocked_until > time.time()
+
+    def health(self, url: str) -> float:
+        host = host_of(url)
+        return 0.0 if self.is_blocked(host) else self.stats(host).health()
+
+    # --- robots.txt ---
+    def allowed(self, url: str) -> bool:
+        # urllib.robotparser pulls in urllib.request/http.client/ssl; import on first use
+        from urllib.robotparser import RobotFileParser
+
+        host = host_of(url)
+        cached = self._robots.get(host)
+        if cached is None or time.time() - cached[1] > ROBOTS_TTL:
+            path = self._robots_path(host)
+            try:
+                fetched_at = os.path.getmtime(path)
+                with open(path, "r", encoding="utf-8") as f:
+                    body = f.read()
+            except OSError:
+                fetched_at, body = 0.0, ""
+            if time.time() - fetched_at > ROBOTS_TTL:
+                body, fetched_at = self._download_robots(url), time.time()
+                self._store_robots(path, body)
+            parser = RobotFileParser()
+            parser.parse(body.splitlines())
+            cached = self._robots[host] = (parser, fetched_at)
+        return cached[0].can_fetch(ROBOTS_AGENT, url)
+
+    def _robots_path(self, host: str) -> str:
+        return os.path.join(self.robots_dir, re.sub(r"[^a-z0-9.-]", "_", host) + ".txt")
+
+    def _store_robots(self, path: str, body: str):
+        """Cache one host's robots.txt in its own file; the mtime is the download time."""
+        try:
+            os.makedirs(self.robots_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.info("Could not cache robots.txt at %s: %s", path, e)
+
+    def _download_robots(self, url: str) -> str:
+        import requests
+        parts = urlsplit(url)
+        try:
+            r = requests.get(
+                f"{parts.scheme}://{parts.netloc}/robots.txt",
+                timeout=(CONNECT_TIMEOUT, CONNECT_TIMEOUT),
+                headers={"User-Agent": self.user_agent},
+            )
+            if r.status_code == 200:
+                return r.text
+        except Exception as e:
+            logger.info("robots.txt unavailable for %s: %s", parts.netloc, e)
+        return ""    # missing/unreadable robots.txt allows everything
+
+    # --- fetching ---
+    def _slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    def fetch(self, url: str) -> bytes:
+        """Return the raw response body for url.
+
+        Raises FetchSkipped if robots.txt disallows it or the domain is cooling
+        down, and FetchFailed if every attempt failed.
+        """
+        import requests
+
+        host = host_of(url)
+        if not host:
+            raise ValueError(f"Invalid URL: {url}")
+        if self.is_blocked(host):
+            raise FetchSkipped(f"{host} is cooling down after repeated failures")
+        if not self.allowed(url):
+            raise FetchSkipped(f"robots.txt disallows {url}")
+
+        last_error, last_status = "", None
+        for attempt in range(MAX_RETRIES + 1):
+            timeout = self.stats(host).timeout()
+            retry_after = None
+            start = time.monotonic()
+            with self._slot(host):
+                try:
+                    with requests.get(
+                        url,
+                        timeout=(min(CONNECT_TIMEOUT, timeout), timeout),
+                        headers={"User-Agent": self.user_agent, "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8"},
+                        stream=True,
+                    ) as r:
+                        if r.status_code >= 400:
+                            last_status = r.status_code
+                            last_error = f"HTTP {r.status_code}"
+                            if r.status_code not in RETRY_STATUSES:
+                                break
+                            retry_after = r.headers.get("Retry-After")
+                        else:
+                            body = bytearray()
+                            for chunk in r.iter_content(64 * 1024):
+                                body.extend(chunk)
+                                if len(body) > MAX_BYTES:
+                                    break
+                            self._record_success(host, time.monotonic() - start)
+                            return bytes(body[:MAX_BYTES])
+                except requests.Timeout as e:
+                    self._record_latency(host, time.monotonic() - start)    # timeouts count towards p95
+                    last_status, last_error = None, f"timeout after {timeout:.0f}s: {e}"
+                except requests.RequestException as e:
+                    last_status, last_error = None, str(e)
+
+            if attempt == MAX_RETRIES or self.is_blocked(host):
+                break
+            delay = 2 ** attempt + random.random()
+            if retry_after and retry_after.isdigit():
+                delay = min(float(retry_after), 30.0)
+            logger.info("Retrying %s in %.1fs (%s)", url, delay, last_error)
+            time.sleep(delay)
+
+        # Retries of one URL are a single strike against the domain, so one
+        # bad article can't cool down a whole site
+        self._record_failure(host, last_status)
+        raise FetchFailed(f"Failed to fetch {url}: {last_error}")
+
+
+@lru_cache(maxsize=None)
+def get_scheduler() -> FetchScheduler:
+    return FetchScheduler()
@@ -2,18 +2,20 @@
 
 
 Fetch and extract article content using trafilatura with a
-requests+BS4 fallback. Returns a dict with title and text.
+BS4 fallback. Downloads go through the per-domain FetchScheduler.
+Returns a dict with title and text.
 """
 
 
-from typing import Dict
-import trafilatura
-import requests
-from bs4 import BeautifulSoup
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List
 import logging
 import re
 import json
 
+from tools.fetch_scheduler import FetchSkipped, get_scheduler, host_of
+
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +24,9 @@ def fetch_article_content(url: str) -> Dict:
     """
     Downloads and extracts the main text and title from a URL.
 
-    It first tries the high-quality parser `trafilatura`. If that fails,
-    it uses a robust fallback method with `requests` and `BeautifulSoup`.
+    The page is downloaded once through the fetch scheduler (robots.txt,
+    per-domain timeouts and backoff). It is then parsed with the
+    high-quality parser `trafilatura`, falling back to `BeautifulSoup`.
 
     Returns a dictionary:
     {
@@ -36,44 +39,46 @@ def fetch_article_content(url: str) -> Dict:
         logger.error("URL must be provided.")
         raise ValueError("URL must be provided")
 
+    try:
+        downloaded_html = get_scheduler().fetch(url)
+    except FetchSkipped as e:
+        logger.warning(f"Skipping {url}: {e}")
+        return {"title": url, "text": "", "url": url}
+    except Exception as e:
+        logger.error(f"Download failed for {url}: {e}")
+        return {"title": url, "text": "", "url": url}
+
     # --- Method 1: Trafilatura (Primary) ---
     try:
+        import trafilatura
         logger.info(f"Attempting extraction with Trafilatura for: {url}")
-        downloaded_html = trafilatura.fetch_url(url)
-        
-        if downloaded_html:
-            # Get the output as a JSON string
-            extracted_json_string = trafilatura.extract(
-                downloaded_html,
-                output_format='json',
-                include_comments=False,
-                include_tables=False,
-                favor_precision=True
-            )
-            if extracted_json_string:
-                data = json.loads(extracted_json_string)
-                # If we get text, we're done. Return it.
-                if data and data.get('text') and data['text'].strip():
-                    logger.info(f"Trafilatura SUCCESS for: {url}")
-                    return {
-                        "title": (data.get('title') or url).strip(),
-                        "text": data['text'].strip(),
-                        "url": url
-                    }
+        # Get the output as a JSON string
+        extracted_json_string = trafilatura.extract(
+            downloaded_html,
+            output_format='json',
+            include_comments=False,
+            include_tables=False,
+            favor_precision=True
+        )
+        if extracted_json_string:
+            data = json.loads(extracted_json_string)
+            # If we get text, we're done. Return it.
+            if data and data.get('text') and data['text'].strip():
+                logger.info(f"Trafilatura SUCCESS for: {url}")
+                return {
+                    "title": (data.get('title') or url).strip(),
+                    "text": data['text'].strip(),
+                    "url": url
+                }
         logger.warning(f"Trafilatura failed to extract meaningful content from: {url}")
     except Exception as e:
         logger.warning(f"Trafilatura process failed for {url}: {e}")
 
-    # --- Method 2: Requests + BeautifulSoup (Fallback) ---
+    # --- Method 2: BeautifulSoup (Fallback) ---
     try:
-        logger.info(f"Attempting fallback with Requests/BS4 for: {url}")
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        r = requests.get(url, timeout=15, headers=headers)
-        r.raise_for_status()
-
-        soup = BeautifulSoup(r.text, "html.parser")
+        from bs4 import BeautifulSoup
+        logger.info(f"Attempting fallback with BS4 for: {url}")
+        soup = BeautifulSoup(downloaded_html, "html.parser")
         
         title_tag = soup.find("title")
         title = title_tag.get_text().strip() if title_tag else url
@@ -94,18 +99,61 @@ def fetch_article_content(url: str) -> Dict:
         cleaned_text = re.sub(r'\n{3,}', '\n\n', full_text).strip()
 
         if cleaned_text:
-            logger.info(f"Requests/BS4 fallback SUCCESS for: {url}")
+            logger.info(f"BS4 fallback SUCCESS for: {url}")
             return {"title": title, "text": cleaned_text, "url": url}
     except Exception as e:
-        logger.error(f"Requests/BS4 fallback also failed for {url}: {e}")
+        logger.error(f"BS4 fallback also failed for {url}: {e}")
 
     # --- Final Fallback: Return placeholders ---
     logger.warning(f"All extraction methods failed for: {url}. Returning placeholders.")
     return {"title": url, "text": "", "url": url}
 
 
+def fetch_articles(urls: List[str], max_workers: int = 8) -> List[Dict]:
+    """
+    Extract several URLs concurrently, in input order.
+
+    At most `per_host_limit` URLs per host are in flight at once, so a
+    pool worker never sits waiting on a busy host while other hosts have
+    work. Healthy domains are started first.
+    """
+    scheduler = get_scheduler()
+    by_host: Dict[str, deque] = {}
+    for i, url in enumerate(urls):
+        by_host.setdefault(host_of(url), deque()).append(i)
+    hosts = sorted(by_host, key=lambda h: scheduler.health(urls[by_host[h][0]]), reverse=True)
+
+    results: List[Dict] = [{}] * len(urls)
+    in_flight: Dict[str, int] = {}
+    pending: Dict = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        def fill():
+            for host in hosts:
+                queue = by_host[host]
+                while queue and in_flight.get(host, 0) < scheduler.per_host_limit:
+                    i = queue.popleft()
+                    in_flight[host] = in_flight.get(host, 0) + 1
+                    pending[pool.submit(fetch_article_content, urls[i])] = (i, host)
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                i, host = pending.pop(future)
+                in_flight[host] -= 1
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    # One bad URL must not lose the rest of the batch
+                    logger.error(f"Extraction failed for {urls[i]!r}: {e}")
+                    results[i] = {"title": urls[i], "text": "", "url": urls[i]}
+            fill()
+    scheduler.flush()
+    return results
+
+
 if __name__ == "__main__":
-    import dotenv, json
-    dotenv.load_dotenv()
+    import json
     test_url = "https://www.tomsguide.com/computing/vpns/arizona-sees-spike-in-demand-for-vpns-following-the-introduction-of-age-verification-laws"
     print(json.dumps(fetch_article_content(test_url), indent=2))
\ No newline at end of file
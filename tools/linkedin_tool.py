@@ -1,42 +1,26 @@
 import os
-import json
 import datetime
-from dotenv import load_dotenv
-import requests
 
-load_dotenv()
-
-DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
-os.makedirs(DATA_DIR, exist_ok=True)
+from utils.config import load_config
+from utils.storage import posts_store
 
 
 def _save_local_post(post_text: str, metadata: dict | None = None):
-    """Save the generated post locally in JSON for backup."""
-    filepath = os.path.join(DATA_DIR, "generated_posts.json")
-    data = []
-
-    if os.path.exists(filepath):
-        with open(filepath, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-            except json.JSONDecodeError:
-                data = []
-
+    """Append the generated post to the local post history (data/posts/) for backup."""
     entry = {
         "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
         "post": post_text,
         "metadata": metadata or {},
     }
 
-    data.append(entry)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-
-    return filepath
+    store = posts_store()
+    store.append(entry)
+    return store.directory
 
 
 def get_linkedin_author_urn(token: str):
     """Fetch the LinkedIn URN for the authenticated user."""
+    import requests
     url = "https://api.linkedin.com/v2/me"
     headers = {"Authorization": f"Bearer {token}"}
     resp = requests.get(url, headers=headers)
@@ -48,13 +32,27 @@ def get_linkedin_author_urn(token: str):
         raise Exception(f"Failed to get author URN: {resp.status_code} - {resp.text}")
 
 
-def post_to_linkedin(post_text: str, publish: bool = False, metadata: dict | None = None):
+def post_to_linkedin(
+    post_text: str,
+    publish: bool = False,
+    metadata: dict | None = None,
+    access_token: str | None = None,
+    author_urn: str | None = None,
+):
     """
     Posts text to LinkedIn if credentials exist, otherwise saves locally.
     publish=False => local save only (safe for MVP)
+
+    access_token/author_urn override LINKEDIN_ACCESS_TOKEN/LINKEDIN_AUTHOR_URN,
+    so one process can publish on behalf of several accounts. When a token
+    is passed explicitly the URN is never taken from the environment.
     """
-    token = os.getenv("LINKEDIN_ACCESS_TOKEN")
-    author_urn = os.getenv("LINKEDIN_AUTHOR_URN")
+    load_config()
+    if access_token:
+        token = access_token
+    else:
+        token = os.getenv("LINKEDIN_ACCESS_TOKEN")
+        author_urn = author_urn or os.getenv("LINKEDIN_AUTHOR_URN")
 
     # If not publishing, just save locally
     if not publish:
@@ -102,6 +100,7 @@ def post_to_linkedin(post_text: str, publish: bool = False, metadata: dict | Non
     }
 
     try:
+        import requests
         resp = requests.post(url, headers=headers, json=payload)
         if resp.status_code == 201:
             _save_local_post(post_text, metadata)
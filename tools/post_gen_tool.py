@@ -2,55 +2,120 @@
 
 
 Generate a LinkedIn-style post using Gemini (Google Generative AI)
-via LangChain's Google chat wrapper. The function reads the prompt
-template from prompts/post_prompt.txt and fills {article_text}.
+via LangChain's Google chat wrapper. The prompt template is compiled by
+tools.prompt_library into a static system prefix and a per-article
+suffix, so the instructions can be served from Gemini's context cache.
 """
 
 
-from typing import Optional
+from typing import Dict, Optional, Tuple
 import os
 import logging
-from dotenv import load_dotenv
-load_dotenv()
+import threading
+import time
 
-
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+from utils.config import load_config
+from tools.prompt_library import CompiledPrompt, compile_prompt, record_usage, should_cache
 
 
 logger = logging.getLogger(__name__)
 
-def _load_prompt_template(path: str) -> str:
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
-    
+MODEL = "gemini-2.5-flash"
+PROMPT_PATH = os.path.join(os.path.dirname(__file__), "..", "prompts", "post_prompt.txt")
+CACHE_TTL = 3600
+
+# template version -> (cached content name, expiry timestamp); an empty name
+# marks a failed creation that is not retried before the expiry
+_explicit_caches: Dict[str, Tuple[str, float]] = {}
+_cache_lock = threading.Lock()
+
 
-def _init_llm():
+def _api_key() -> str:
+    load_config()
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
         raise EnvironmentError("GOOGLE_API_KEY is not set in environment")
-    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.7)
+    return api_key
+
+
+def _init_llm(cached_content: Optional[str] = None):
+    # LangChain/Gemini are heavy imports; only pay for them when generating
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    _api_key()
+    llm = ChatGoogleGenerativeAI(model=MODEL, temperature=0.7, cached_content=cached_content)
     return llm
 
 
-def generate_linkedin_post(article_text: str, prompt_path: str = "../prompts/post_prompt.txt") -> str:
+def _explicit_cache(prompt: CompiledPrompt) -> Optional[str]:
+    """Return a cached-content name holding the prompt's static prefix, creating it if worthwhile."""
+    with _cache_lock:
+        name, expires = _explicit_caches.get(prompt.version, ("", 0.0))
+        if name and expires - time.time() > 60:
+            return name
+        if not name and expires > time.time():
+            return None    # creation failed recently; don't retry on every call
+        if not should_cache(prompt):
+            return None
+        try:
+            from google.ai import generativelanguage_v1beta as glm
+            from google.protobuf import duration_pb2
+
+            client = glm.CacheServiceClient(client_options={"api_key": _api_key()})
+            cache = client.create_cached_content(cached_content=glm.CachedContent(
+                model=f"models/{MODEL}",
+                system_instruction=glm.Content(parts=[glm.Part(text=prompt.system_prefix)]),
+                ttl=duration_pb2.Duration(seconds=CACHE_TTL),
+            ))
+        except Exception as e:
+            logger.warning("Context cache unavailable, sending the prompt prefix inline for %ds: %s", CACHE_TTL, e)
+            _explicit_caches[prompt.version] = ("", time.time() + CACHE_TTL)
+            return None
+        _explicit_caches[prompt.version] = (cache.name, time.time() + CACHE_TTL)
+        logger.info("Cached prompt %s@%s as %s", prompt.name, prompt.version, cache.name)
+        return cache.name
+
+
+def _invoke(prompt: CompiledPrompt, article_text: str, cached_content: Optional[str]):
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    messages = [HumanMessage(content=prompt.render_suffix(article_text))]
+    if not cached_content and prompt.system_prefix:
+        # Static instructions first, so the shared prefix can be cached implicitly
+        messages.insert(0, SystemMessage(content=prompt.system_prefix))
+    return _init_llm(cached_content).invoke(messages)
+
+
+def generate_linkedin_post(article_text: str, prompt_path: str = PROMPT_PATH) -> str:
     """Return generated post text (string)."""
     if not article_text:
         raise ValueError("article_text must not be empty")
 
-    template = _load_prompt_template(prompt_path)
-    llm = _init_llm()
-
-    prompt = PromptTemplate(template=template, input_variables=["article_text"])
-    chain = prompt | llm | StrOutputParser()
-    out = chain.invoke({"article_text": article_text})
-
+    from langchain_core.output_parsers import StrOutputParser
+
+    prompt = compile_prompt(prompt_path)
+    cached_content = _explicit_cache(prompt) if prompt.system_prefix else None
+    try:
+        response = _invoke(prompt, article_text, cached_content)
+    except Exception as e:
+        if not cached_content:
+            raise
+        logger.warning("Cached call failed (%s); retrying without the context cache", e)
+        with _cache_lock:
+            _explicit_caches.pop(prompt.version, None)
+        cached_content = None
+        response = _invoke(prompt, article_text, None)
+
+    saved = record_usage(prompt, bool(cached_content), getattr(response, "usage_metadata", None))
+    if saved:
+        logger.info("Prompt %s@%s: ~%d input tokens served from cache", prompt.name, prompt.version, saved)
+
+    out = StrOutputParser().invoke(response)
     return str(out).strip()
 
 
 if __name__ == "__main__":
     
-    with open("../data/sample_article_text.txt", "r") as f:
+    sample_path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_article_text.txt")
+    with open(sample_path, "r") as f:
         sample_text = f.read()
     print(generate_linkedin_post(sample_text))
\ No newline at end of file
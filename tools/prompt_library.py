@@ -0,0 +1,206 @@
+"""prompt_library.py
+
+
+Compile prompt templates once and split them for context caching.
+
+A template such as prompts/post_prompt.txt is cleaned of chat preamble
+("Of course. Here is the updated prompt..."), validated, and split into:
+
+- a static system prefix (every instruction, no placeholders), and
+- a short per-article suffix holding the `{article_text}` section.
+
+The prefix is identical on every call, so it can be sent as a system
+instruction that Gemini caches implicitly, or uploaded once as an
+explicit cached context when the local token estimate says it pays off.
+Input tokens saved are tracked per template version in
+data/prompt_stats.json.
+
+Functions:
+compile_prompt(path) -> CompiledPrompt
+should_cache(prompt) -> bool
+record_usage(prompt, explicit_cache, usage_metadata) -> int
+"""
+
+
+from dataclasses import dataclass
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, Optional
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+STATS_PATH = os.path.join(DATA_DIR, "prompt_stats.json")
+
+PLACEHOLDER = "article_text"
+CHARS_PER_TOKEN = 4
+# Smallest prefix the Gemini API accepts for explicit context caching
+MIN_CACHE_TOKENS = 1024
+# Explicit caches cost storage, so only create one once a template is reused
+CACHE_AFTER_CALLS = 2
+
+_PREAMBLE_RE = re.compile(r"^(of course|sure|certainly|absolutely|here is|here's)\b", re.IGNORECASE)
+_RULE_RE = re.compile(r"^\s*(\*\*\*+|---+|___+)\s*$")
+_HEADING_RE = re.compile(r"^\s*#{1,6}\s")
+_SECTION_RE = re.compile(r"^\*\*(?:\d+\.\s*)?(.+?):?\*\*\s*$")
+
+
+class PromptError(ValueError):
+    """Raised when a prompt template is malformed."""
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    name: str
+    version: str
+    system_prefix: str
+    suffix_template: str
+    prefix_tokens: int
+
+    def render_suffix(self, article_text: str) -> str:
+        return self.suffix_template.format(**{PLACEHOLDER: article_text})
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _strip_preamble(text: str) -> str:
+    """Drop chat preamble before the first rule line and any headings after it."""
+    lines = text.strip().splitlines()
+    if lines and _PREAMBLE_RE.match(lines[0].strip()):
+        for i, line in enumerate(lines):
+            if _RULE_RE.match(line):
+                lines = lines[i + 1:]
+                break
+    while lines and (not lines[0].strip() or _HEADING_RE.match(lines[0]) or _RULE_RE.match(lines[0])):
+        lines.pop(0)
+    return "\n".join(lines).strip()
+
+
+def _validate(text: str, path: str):
+    try:
+        fields = [name for _, name, _, _ in Formatter().parse(text) if name is not None]
+    except ValueError as e:
+        raise PromptError(f"{path}: invalid template syntax ({e}); escape literal braces as {{{{ }}}}") from e
+    others = sorted(set(fields) - {PLACEHOLDER})
+    if others:
+        raise PromptError(f"{path}: unknown placeholders {others}; only {{{PLACEHOLDER}}} is supported")
+    count = sum(name == PLACEHOLDER for name in fields)
+    if count != 1:
+        raise PromptError(f"{path}: expected exactly one {{{PLACEHOLDER}}} placeholder, found {count}")
+
+
+def _split(text: str):
+    """Return (static prefix, suffix template).
+
+    The line holding the placeholder, and the bold section header right
+    above it, move to the end; the prefix keeps the header with a pointer.
+    If the placeholder is embedded in a sentence, nothing can be hoisted.
+    """
+    lines = text.splitlines()
+    idx = next(i for i, line in enumerate(lines) if "{" + PLACEHOLDER + "}" in line)
+    if lines[idx].strip().strip("`").strip() != "{" + PLACEHOLDER + "}":
+        return "", text
+
+    header = idx - 1
+    while header >= 0 and not lines[header].strip():
+        header -= 1
+    match = _SECTION_RE.match(lines[header].strip()) if header >= 0 else None
+    label = match.group(1) if match else "Article"
+
+    prefix_lines = lines[:idx] if match else lines[:idx] + [f"**{label}:**"]
+    prefix_lines.append("Provided in the next message, after these instructions.")
+    prefix = "\n".join(prefix_lines + lines[idx + 1:]).strip()
+    # The prefix is sent verbatim, so undo format escaping
+    prefix = prefix.replace("{{", "{").replace("}}", "}")
+    suffix = f"**{label}:**\n{lines[idx].strip()}"
+    return prefix, suffix
+
+
+@lru_cache(maxsize=32)
+def _compile(path: str, mtime: float) -> CompiledPrompt:
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    text = _strip_preamble(source)
+    _validate(text, path)
+    prefix, suffix = _split(text)
+    compiled = CompiledPrompt(
+        name=os.path.splitext(os.path.basename(path))[0],
+        version=hashlib.sha256(source.encode("utf-8")).hexdigest()[:12],
+        system_prefix=prefix,
+        suffix_template=suffix,
+        prefix_tokens=estimate_tokens(prefix),
+    )
+    logger.info("Compiled prompt %s@%s (static prefix ~%d tokens)", compiled.name, compiled.version, compiled.prefix_tokens)
+    return compiled
+
+
+def compile_prompt(path: str) -> CompiledPrompt:
+    """Parse, clean, validate and split a template; cached until the file changes."""
+    path = os.path.abspath(path)
+    return _compile(path, os.path.getmtime(path))
+
+
+_stats_lock = threading.Lock()
+_call_counts: Dict[str, int] = {}
+
+
+def should_cache(prompt: CompiledPrompt) -> bool:
+    """Whether an explicit cached context is worth creating for this prompt.
+
+    Needs a prefix above the API minimum and at least CACHE_AFTER_CALLS uses
+    in this process; a one-off CLI run relies on implicit caching instead.
+    """
+    if os.getenv("PROMPT_CACHE", "auto").lower() == "off":
+        return False
+    with _stats_lock:
+        calls = _call_counts.get(prompt.version, 0)
+    return prompt.prefix_tokens >= MIN_CACHE_TOKENS and calls >= CACHE_AFTER_CALLS - 1
+
+
+def _load_stats() -> Dict:
+    try:
+        with open(STATS_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def record_usage(prompt: CompiledPrompt, explicit_cache: bool, usage_metadata: Optional[Dict] = None) -> int:
+    """Record one call and return the input tokens saved by caching.
+
+    Uses the provider-reported cache_read count when available, otherwise
+    assumes the whole prefix was served from an explicit cache.
+    """
+    details = (usage_metadata or {}).get("input_token_details") or {}
+    saved = details.get("cache_read") or (prompt.prefix_tokens if explicit_cache else 0)
+
+    with _stats_lock:
+        _call_counts[prompt.version] = _call_counts.get(prompt.version, 0) + 1
+        stats = _load_stats()
+        entry = stats.setdefault(prompt.version, {
+            "template": prompt.name,
+            "prefix_tokens": prompt.prefix_tokens,
+            "calls": 0,
+            "cached_calls": 0,
+            "input_tokens_saved": 0,
+        })
+        entry["calls"] += 1
+        entry["cached_calls"] += 1 if saved else 0
+        entry["input_tokens_saved"] += saved
+        os.makedirs(DATA_DIR, exist_ok=True)
+        tmp = f"{STATS_PATH}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+        os.replace(tmp, STATS_PATH)
+    return saved
@@ -14,44 +14,53 @@ Each dict: {"title": str, "url": str, "source": str}
 """
 
 
+from functools import lru_cache
 from typing import List, Dict, Optional
 import os
 import logging
 import random
 
+from utils.config import load_config
+
 logger = logging.getLogger(__name__)
 
-try:
-    from serpapi import GoogleSearch
-    google_search = GoogleSearch
-    SERPAPI_AVAILABLE = True
-except Exception:
-    logger.warning("SerpAPI is not available.")
-    SERPAPI_AVAILABLE = False
 
+# Providers are imported on first use so that importing this module stays cheap.
+@lru_cache(maxsize=None)
+def _load_serpapi():
+    try:
+        from serpapi import GoogleSearch
+        return GoogleSearch
+    except Exception:
+        logger.warning("SerpAPI is not available.")
+        return None
 
-try:
-    from ddgs import DDGS
-    ddg = DDGS
-    DUCKDUCKGO_AVAILABLE = True
-except Exception:
-    logger.warning("DuckDuckGo search is not available.")
-    DUCKDUCKGO_AVAILABLE = False
+
+@lru_cache(maxsize=None)
+def _load_duckduckgo():
+    try:
+        from ddgs import DDGS
+        return DDGS
+    except Exception:
+        logger.warning("DuckDuckGo search is not available.")
+        return None
 
 
 # Optional reddit
-try:
-    import praw
-    praw = praw
-    REDDIT_AVAILABLE = True
-except Exception:
-    logger.warning("Reddit lookup is not available.")
-    REDDIT_AVAILABLE = False
+@lru_cache(maxsize=None)
+def _load_praw():
+    try:
+        import praw
+        return praw
+    except Exception:
+        logger.warning("Reddit lookup is not available.")
+        return None
 
 
 def _search_serpapi(query: str, limit: int) -> List[Dict]:
     api_key = os.getenv("SERPAPI_API_KEY")
-    if not SERPAPI_AVAILABLE or not api_key:
+    google_search = _load_serpapi() if api_key else None
+    if google_search is None:
         logger.warning("SerpAPI search is not available.")
         return []
     params = {
@@ -76,7 +85,8 @@ def _search_serpapi(query: str, limit: int) -> List[Dict]:
         return []
 
 def _search_duckduckgo(query: str, limit: int) -> List[Dict]:
-    if not DUCKDUCKGO_AVAILABLE or ddg is None:
+    ddg = _load_duckduckgo()
+    if ddg is None:
         logger.warning("DuckDuckGo search is not available.")
         return []
     try:
@@ -96,7 +106,10 @@ def _search_reddit(limit: int) -> List[Dict]:
     client_id = os.getenv("REDDIT_CLIENT_ID")
     client_secret = os.getenv("REDDIT_CLIENT_SECRET")
     user_agent = os.getenv("REDDIT_USER_AGENT", "linkedin_auto_mvp")
-    if not REDDIT_AVAILABLE or not client_id or not client_secret:
+    if not client_id or not client_secret:
+        return []
+    praw = _load_praw()
+    if praw is None:
         return []
     out = []
     try:
@@ -122,6 +135,7 @@ def get_trending_topics(query: Optional[str] = None, web_limit: int = 5, reddit_
 
     Priority: SerpAPI -> DuckDuckGo -> Reddit (as an add-on)
     """
+    load_config()
     query = query or os.getenv("DEFAULT_SEARCH_QUERY", "latest tech news")
 
     # Reddit search
@@ -161,8 +175,6 @@ def get_trending_topics(query: Optional[str] = None, web_limit: int = 5, reddit_
 
 
 if __name__ == "__main__":
-    import dotenv
-    dotenv.load_dotenv()
     import json
     topics = get_trending_topics(web_limit=3, reddit_limit=2)
     print(json.dumps(topics, indent=2))
\ No newline at end of file
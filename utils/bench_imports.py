@@ -0,0 +1,88 @@
+"""bench_imports.py
+
+
+Import-time benchmark for the CLI entry points and tool modules.
+
+Each module is imported in a fresh interpreter with `-X importtime`
+and the cumulative time reported for it is taken; the median over
+several runs is printed. Run from the project root:
+
+    python -m utils.bench_imports [--runs 5] [--max-ms 300]
+
+With --max-ms the script exits non-zero if any module is slower, so it
+can guard cron/CI runs against regressions.
+"""
+
+
+from typing import Dict, List
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+MODULES = [
+    "utils.config",
+    "utils.helper",
+    "tools.search_tool",
+    "tools.fetch_tool",
+    "tools.post_gen_tool",
+    "tools.linkedin_tool",
+    "main",
+    "server",
+]
+
+
+def _import_time_us(module: str) -> int:
+    """Return the cumulative import time of `module` in microseconds."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    for line in reversed(proc.stderr.splitlines()):
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def run(modules: List[str], runs: int) -> Dict[str, float]:
+    results = {}
+    for module in modules:
+        samples = [_import_time_us(module) for _ in range(runs)]
+        results[module] = statistics.median(samples) / 1000
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure import time of PulsePost modules.")
+    parser.add_argument("modules", nargs="*", default=MODULES, help="Modules to import (default: all entry points)")
+    parser.add_argument("--runs", type=int, default=5, help="Imports per module; the median is reported")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if any module takes longer than this")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        try:
+            ms = run([module], args.runs)[module]
+        except RuntimeError as e:
+            print(f"{module:<24} ERROR  {e}")
+            failed = True
+            continue
+        over = args.max_ms is not None and ms > args.max_ms
+        failed = failed or over
+        print(f"{module:<24} {ms:8.1f} ms{'  (over budget)' if over else ''}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
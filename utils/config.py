@@ -0,0 +1,21 @@
+"""config.py
+
+
+Single entry point for loading configuration from the project's .env
+file. Call load_config() before reading settings with os.getenv();
+the file is parsed once per process no matter how many modules ask.
+"""
+
+
+from functools import lru_cache
+import os
+
+
+ENV_PATH = os.path.join(os.path.dirname(__file__), "..", ".env")
+
+
+@lru_cache(maxsize=None)
+def load_config() -> bool:
+    """Load .env into os.environ (existing variables win). Returns True if a file was loaded."""
+    from dotenv import load_dotenv
+    return load_dotenv(ENV_PATH)
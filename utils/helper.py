@@ -1,18 +1,19 @@
 import os
-import requests
-from dotenv import load_dotenv
+import sys
 
-load_dotenv()
-
-client_id = os.getenv("LINKEDIN_CLIENT_ID")
-client_secret = os.getenv("LINKEDIN_CLIENT_SECRET")
-token = os.getenv("LINKEDIN_ACCESS_TOKEN")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from utils.config import load_config
 
 
 def get_token():
     """
     Step 1: Get authorization URL with proper scopes
     """
+    import requests
+    load_config()
+    client_id = os.getenv("LINKEDIN_CLIENT_ID")
+    client_secret = os.getenv("LINKEDIN_CLIENT_SECRET")
+
     # Required scopes for basic profile access and posting
     scopes = [
         "openid",
@@ -66,6 +67,9 @@ def get_user_info():
     """
     Get user info using OpenID Connect userinfo endpoint (recommended)
     """
+    import requests
+    load_config()
+    token = os.getenv("LINKEDIN_ACCESS_TOKEN")
     url = "https://api.linkedin.com/v2/userinfo"
     headers = {"Authorization": f"Bearer {token}"}
 
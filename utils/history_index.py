@@ -0,0 +1,277 @@
+"""history_index.py
+
+
+Local search index over past posts and extracted articles, kept in
+data/history.sqlite and updated on every save to the record stores.
+
+- Keyword search uses an SQLite FTS5 table (contentless; the text lives
+  in the record stores).
+- Near-duplicate search uses 64-value MinHash signatures over word
+  3-grams, bucketed into 16 LSH bands so a lookup only compares a handful
+  of candidates instead of scanning the history.
+
+Used by the CLI/UI to flag topics that were already posted about and
+articles that near-duplicate earlier ones.
+"""
+
+
+from array import array
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import struct
+
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+INDEX_PATH = os.path.join(DATA_DIR, "history.sqlite")
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 64) - 1
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _permutations():
+    """Deterministic (a, b) pairs for the MinHash hash family."""
+    perms = []
+    for i in range(NUM_PERM):
+        digest = hashlib.blake2b(f"pulsepost-minhash-{i}".encode(), digest_size=16).digest()
+        a, b = struct.unpack("<QQ", digest)
+        perms.append((a % (_PRIME - 1) + 1, b % _PRIME))
+    return perms
+
+
+_PERMS = _permutations()
+
+
+def _tokens(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def minhash(text: str) -> array:
+    """MinHash signature of the word 3-grams in text."""
+    words = _tokens(text)
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)} if words else set()
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") for s in shingles]
+
+    sig = array("Q", [_MAX_HASH] * NUM_PERM)
+    if hashes:
+        for i, (a, b) in enumerate(_PERMS):
+            sig[i] = min((a * h + b) % _PRIME for h in hashes)
+    return sig
+
+
+def similarity(sig_a: array, sig_b: array) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def _band_hashes(sig: array) -> List[int]:
+    out = []
+    for band in range(BANDS):
+        chunk = sig[band * ROWS:(band + 1) * ROWS].tobytes()
+        # SQLite integers are signed 64-bit
+        out.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True))
+    return out
+
+
+def _fts_query(text: str, column: Optional[str] = None) -> str:
+    """Quote every token so user text can't be parsed as FTS5 syntax."""
+    terms = " ".join('"' + t.replace('"', '""') + '"' for t in _tokens(text))
+    if column and terms:
+        return f"{column} : ({terms})"
+    return terms
+
+
+class HistoryIndex:
+    """FTS5 + MinHash index over post and article history."""
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS docs (
+                    rowid INTEGER PRIMARY KEY,
+                    doc_id TEXT UNIQUE NOT NULL,
+                    kind TEXT NOT NULL,
+                    url TEXT,
+                    title TEXT,
+                    ts TEXT,
+                    sig BLOB NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS docs_kind_url ON docs(kind, url);
+                CREATE TABLE IF NOT EXISTS bands (
+                    band INTEGER NOT NULL,
+                    hash INTEGER NOT NULL,
+                    doc INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS bands_lookup ON bands(band, hash);
+                CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+                    title, body, content='', tokenize='porter unicode61'
+                );
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:    # commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, doc_id: str, kind: str, text: str, title: str = "", url: Optional[str] = None, ts: Optional[str] = None) -> bool:
+        """Index a document. Returns False if doc_id was already indexed."""
+        sig = minhash(f"{title} {text}")
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO docs (doc_id, kind, url, title, ts, sig) VALUES (?, ?, ?, ?, ?, ?)",
+                (doc_id, kind, url, title, ts, sig.tobytes()),
+            )
+            if not cur.rowcount:
+                return False
+            rowid = cur.lastrowid
+            conn.execute("INSERT INTO docs_fts (rowid, title, body) VALUES (?, ?, ?)", (rowid, title, text))
+            conn.executemany(
+                "INSERT INTO bands (band, hash, doc) VALUES (?, ?, ?)",
+                [(band, h, rowid) for band, h in enumerate(_band_hashes(sig))],
+            )
+        return True
+
+    def indexed_ids(self, kind: str) -> set:
+        with self._connect() as conn:
+            return {r["doc_id"] for r in conn.execute("SELECT doc_id FROM docs WHERE kind = ?", (kind,))}
+
+    def search(self, query: str, kind: Optional[str] = None, limit: int = 10, column: Optional[str] = None) -> List[Dict]:
+        """Keyword search (all terms must match), best matches first."""
+        match = _fts_query(query, column)
+        if not match:
+            return []
+        sql = (
+            "SELECT d.doc_id, d.kind, d.url, d.title, d.ts FROM docs_fts"
+            " JOIN docs d ON d.rowid = docs_fts.rowid WHERE docs_fts MATCH ?"
+        )
+        params: list = [match]
+        if kind:
+            sql += " AND d.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY bm25(docs_fts) LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            return [dict(r) for r in conn.execute(sql, params)]
+
+    def near_duplicates(
+        self,
+        text: str,
+        kind: Optional[str] = None,
+        threshold: float = 0.5,
+        limit: int = 5,
+        exclude_url: Optional[str] = None,
+    ) -> List[Dict]:
+        """Documents whose estimated Jaccard similarity to text is >= threshold."""
+        sig = minhash(text)
+        conditions = " OR ".join("(b.band = ? AND b.hash = ?)" for _ in range(BANDS))
+        params: list = [v for pair in enumerate(_band_hashes(sig)) for v in pair]
+        sql = (
+            "SELECT DISTINCT d.rowid, d.doc_id, d.kind, d.url, d.title, d.ts, d.sig"
+            f" FROM bands b JOIN docs d ON d.rowid = b.doc WHERE ({conditions})"
+        )
+        if kind:
+            sql += " AND d.kind = ?"
+            params.append(kind)
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        out = []
+        for r in rows:
+            if exclude_url and r["url"] == exclude_url:
+                continue
+            score = similarity(sig, array("Q", r["sig"]))
+            if score >= threshold:
+                out.append({k: r[k] for k in ("doc_id", "kind", "url", "title", "ts")} | {"similarity": score})
+        out.sort(key=lambda d: d["similarity"], reverse=True)
+        return out[:limit]
+
+    def find_repeats(self, title: str, url: Optional[str] = None, limit: int = 5) -> List[Dict]:
+        """Past posts made from the same article url or with a topic title containing every word of title.
+
+        Only posts count: an article that was fetched but never posted is not a repeat.
+        """
+        found: Dict[str, Dict] = {}
+        if url:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT doc_id, kind, url, title, ts FROM docs WHERE kind = 'post' AND url = ? LIMIT ?", (url, limit)
+                )
+                for r in rows:
+                    found[r["doc_id"]] = dict(r)
+        for r in self.search(title, kind="post", limit=limit, column="title"):
+            found.setdefault(r["doc_id"], r)
+        return list(found.values())[:limit]
+
+
+def _post_title(record: Dict) -> str:
+    topic = (record.get("metadata") or {}).get("topic") or ""
+    if isinstance(topic, dict):
+        topic = topic.get("title") or ""
+    return str(topic)
+
+
+def _post_url(record: Dict) -> Optional[str]:
+    """Url of the article the post was generated from (metadata["url"] or a topic dict's url)."""
+    metadata = record.get("metadata") or {}
+    topic = metadata.get("topic")
+    return metadata.get("url") or (topic.get("url") if isinstance(topic, dict) else None)
+
+
+def index_post(record_id: str, record: Dict):
+    history_index().add(
+        record_id, "post", record.get("post", ""),
+        title=_post_title(record), url=_post_url(record), ts=record.get("timestamp"),
+    )
+
+
+def index_article(record_id: str, record: Dict):
+    # Failed extractions (no text) would only match each other on url tokens
+    if not (record.get("text") or "").strip():
+        return
+    history_index().add(
+        record_id, "article", record.get("text", ""),
+        title=record.get("title", ""), url=record.get("url"),
+    )
+
+
+def backfill(kind: str, store, indexer):
+    """Index store records that are missing from the index (e.g. written before it existed)."""
+    indexed = history_index().indexed_ids(kind)
+    missing = [i for i in store.ids() if i not in indexed]
+    if not missing:
+        return
+    logger.info("Indexing %d %s records into %s", len(missing), kind, INDEX_PATH)
+    for record_id in missing:
+        record = store.get(record_id)
+        if record is not None:
+            indexer(record_id, record)
+
+
+@lru_cache(maxsize=None)
+def history_index() -> HistoryIndex:
+    return HistoryIndex()
@@ -0,0 +1,207 @@
+"""job_queue.py
+
+
+Asyncio job manager used by the service mode (server.py).
+
+Jobs are queued per tenant and handed to a bounded pool of workers in
+round-robin order over tenants, so one busy account cannot starve the
+others. Each tenant also has a cap on how many of its jobs may run at
+the same time. Job handlers are plain blocking functions (the existing
+tools) and run on a thread pool sized to the worker count.
+"""
+
+
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import datetime
+import logging
+import uuid
+
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    """Raised when a tenant already has too many pending jobs."""
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+@dataclass
+class Job:
+    tenant: str
+    kind: str
+    params: Dict[str, Any]
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = PENDING
+    result: Any = None
+    error: Optional[str] = None
+    created_at: str = field(default_factory=_now)
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "tenant": self.tenant,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """Bounded worker pool with per-tenant limits and fair scheduling.
+
+    handlers maps a job kind to a callable taking (tenant, params) and
+    returning a JSON-serialisable result.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, Callable[[str, Dict[str, Any]], Any]],
+        workers: int = 4,
+        per_tenant_limit: int = 2,
+        max_pending_per_tenant: int = 100,
+        max_finished: int = 1000,
+    ):
+        self.handlers = handlers
+        self.workers = max(1, workers)
+        self.per_tenant_limit = max(1, per_tenant_limit)
+        self.max_pending_per_tenant = max_pending_per_tenant
+        self.max_finished = max_finished
+
+        self._jobs: Dict[str, Job] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._queues: Dict[str, deque] = {}
+        self._ring: deque = deque()
+        self._running: Dict[str, int] = {}
+        self._cond: Optional[asyncio.Condition] = None
+        self._tasks: list = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._cond = asyncio.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pulsepost-job")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info("Job manager started with %d workers (per-tenant limit %d)", self.workers, self.per_tenant_limit)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def submit(self, tenant: str, kind: str, params: Optional[Dict[str, Any]] = None) -> Job:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if params is not None and not isinstance(params, dict):
+            raise ValueError("params must be a JSON object")
+        if self._cond is None:
+            raise RuntimeError("JobManager.start() must be called before submit()")
+
+        async with self._cond:
+            queue = self._queues.get(tenant)
+            if queue is not None and len(queue) >= self.max_pending_per_tenant:
+                raise QueueFullError(f"Tenant {tenant!r} has too many pending jobs")
+
+            job = Job(tenant=tenant, kind=kind, params=params or {})
+            self._jobs[job.id] = job
+            if queue is None:
+                queue = self._queues[tenant] = deque()
+                self._ring.append(tenant)
+            queue.append(job)
+            self._cond.notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def stats(self, tenant: Optional[str] = None) -> Dict[str, Any]:
+        """Pool-wide totals; per-tenant counts only for the given tenant."""
+        stats = {
+            "workers": self.workers,
+            "per_tenant_limit": self.per_tenant_limit,
+            "pending": sum(len(q) for q in self._queues.values()),
+            "running": sum(self._running.values()),
+        }
+        if tenant is not None:
+            stats["tenant"] = {
+                "pending": len(self._queues.get(tenant, ())),
+                "running": self._running.get(tenant, 0),
+            }
+        return stats
+
+    def _pick(self) -> Optional[Job]:
+        """Return the next job, visiting tenants round-robin and skipping
+        tenants that are already at their concurrency limit."""
+        for _ in range(len(self._ring)):
+            tenant = self._ring[0]
+            self._ring.rotate(-1)
+            if self._running.get(tenant, 0) >= self.per_tenant_limit:
+                continue
+            queue = self._queues[tenant]
+            job = queue.popleft()
+            if not queue:
+                del self._queues[tenant]
+                self._ring.remove(tenant)
+            self._running[tenant] = self._running.get(tenant, 0) + 1
+            return job
+        return None
+
+    async def _next_job(self) -> Job:
+        async with self._cond:    # type: ignore
+            while True:
+                job = self._pick()
+                if job is not None:
+                    return job
+                await self._cond.wait()    # type: ignore
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._next_job()
+            job.status = RUNNING
+            job.started_at = _now()
+            try:
+                handler = self.handlers[job.kind]
+                job.result = await loop.run_in_executor(self._executor, handler, job.tenant, job.params)
+                job.status = SUCCEEDED
+            except Exception as e:
+                logger.warning("Job %s (%s/%s) failed: %s", job.id, job.tenant, job.kind, e)
+                job.error = str(e)
+                job.status = FAILED
+            finally:
+                job.finished_at = _now()
+                self._retire(job)
+                async with self._cond:    # type: ignore
+                    self._running[job.tenant] -= 1
+                    if not self._running[job.tenant]:
+                        del self._running[job.tenant]
+                    self._cond.notify_all()    # type: ignore
+
+    def _retire(self, job: Job):
+        """Keep at most max_finished completed jobs around for polling."""
+        self._finished[job.id] = None
+        while len(self._finished) > self.max_finished:
+            old_id, _ = self._finished.popitem(last=False)
+            self._jobs.pop(old_id, None)
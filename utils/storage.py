@@ -0,0 +1,275 @@
+"""storage.py
+
+
+Compact append-only storage for article and post history under data/.
+
+A store is a directory of segment files plus a small index:
+
+    data/posts/
+        seg-000001.jsonl.zst    records, one compressed frame per record
+        index.jsonl             {"id", "url", "seg", "off", "len", "ts"} per record
+
+Every record is compressed on its own (zstd, or gzip when the optional
+`zstandard` package is missing), so a segment is still a valid
+.jsonl.zst / .jsonl.gz stream for external tools, while single records
+can be read back by id or url from a memory-mapped segment without
+decoding anything else. Appending never rewrites existing data, so save
+cost stays flat as the history grows.
+"""
+
+
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional
+import datetime
+import gzip
+import json
+import logging
+import mmap
+import os
+import threading
+import uuid
+
+try:
+    import fcntl
+except ImportError:    # Windows: fall back to in-process locking only
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+INDEX_NAME = "index.jsonl"
+
+
+@lru_cache(maxsize=None)
+def _load_zstd():
+    try:
+        import zstandard
+        return zstandard
+    except Exception:
+        logger.warning("zstandard is not available; falling back to gzip segments.")
+        return None
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return _load_zstd().ZstdCompressor(level=3).compress(data)    # type: ignore
+    return gzip.compress(data)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        zstd = _load_zstd()
+        if zstd is None:
+            raise RuntimeError("zstandard is required to read .zst segments")
+        return zstd.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class RecordStore:
+    """Append-only store of JSON records with random access by id or url.
+
+    Each record gets an id (given or generated). If the same id or url
+    is appended again, lookups return the newest version; iteration
+    yields every version in append order. Callables in `listeners` are
+    called with (id, record) after every append.
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int = SEGMENT_MAX_BYTES):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        # Re-entrant: append() refreshes the in-memory index while holding it
+        self._lock = threading.RLock()
+        self._entries: List[Dict] = []
+        self._by_id: Dict[str, Dict] = {}
+        self._by_url: Dict[str, Dict] = {}
+        self._index_pos = 0
+        self._maps: Dict[str, mmap.mmap] = {}
+        self.listeners: List[Callable[[str, Dict], None]] = []
+        self._refresh()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_NAME)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._by_id)
+
+    def append(self, record: Dict, id: Optional[str] = None, url: Optional[str] = None) -> str:
+        """Append a record and return its id."""
+        record_id = id or uuid.uuid4().hex
+        codec = "zst" if _load_zstd() is not None else "gz"
+        frame = _compress((json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8"), codec)
+
+        with self._lock:
+            with open(self.index_path, "a+b") as index:
+                if fcntl is not None:
+                    fcntl.flock(index, fcntl.LOCK_EX)    # serialise writers across processes
+                try:
+                    seg = self._active_segment(codec, len(frame))
+                    with open(os.path.join(self.directory, seg), "ab") as f:
+                        off = f.seek(0, os.SEEK_END)
+                        f.write(frame)
+                    entry = {
+                        "id": record_id,
+                        "url": url,
+                        "seg": seg,
+                        "off": off,
+                        "len": len(frame),
+                        "ts": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    }
+                    index.write((json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8"))
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(index, fcntl.LOCK_UN)
+            self._refresh()
+        for listener in self.listeners:
+            try:
+                listener(record_id, record)
+            except Exception as e:
+                # A failing side index must never lose the saved record
+                logger.warning("Store listener failed for %s: %s", record_id, e)
+        return record_id
+
+    def get(self, id: str) -> Optional[Dict]:
+        entry = self._lookup(self._by_id, id)
+        return self._read(entry) if entry else None
+
+    def get_by_url(self, url: str) -> Optional[Dict]:
+        entry = self._lookup(self._by_url, url)
+        return self._read(entry) if entry else None
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            self._refresh()
+            return list(self._by_id)
+
+    def __iter__(self) -> Iterator[Dict]:
+        with self._lock:
+            self._refresh()
+            entries = list(self._entries)
+        for entry in entries:
+            yield self._read(entry)
+
+    def close(self):
+        with self._lock:
+            for m in self._maps.values():
+                m.close()
+            self._maps.clear()
+
+    def _lookup(self, table: Dict[str, Dict], key: str) -> Optional[Dict]:
+        with self._lock:
+            if key not in table:
+                self._refresh()    # another process may have appended it
+            return table.get(key)
+
+    def _active_segment(self, codec: str, incoming: int) -> str:
+        segments = sorted(n for n in os.listdir(self.directory) if n.startswith("seg-"))
+        if segments:
+            last = segments[-1]
+            size = os.path.getsize(os.path.join(self.directory, last))
+            if last.endswith(f".{codec}") and size + incoming <= self.segment_max_bytes:
+                return last
+            number = int(last.split("-")[1].split(".")[0]) + 1
+        else:
+            number = 1
+        return f"seg-{number:06d}.jsonl.{codec}"
+
+    def _refresh(self):
+        """Read index lines appended since the last refresh."""
+        with self._lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_pos)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break    # partially written line; pick it up next time
+                self._index_pos += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping corrupt index line in %s", self.index_path)
+                    continue
+                self._entries.append(entry)
+                self._by_id[entry["id"]] = entry
+                if entry.get("url"):
+                    self._by_url[entry["url"]] = entry
+
+    def _read(self, entry: Dict) -> Dict:
+        end = entry["off"] + entry["len"]
+        with self._lock:
+            m = self._maps.get(entry["seg"])
+            if m is None or len(m) < end:
+                if m is not None:
+                    m.close()
+                with open(os.path.join(self.directory, entry["seg"]), "rb") as f:
+                    m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[entry["seg"]] = m
+            frame = m[entry["off"]:end]
+        codec = entry["seg"].rsplit(".", 1)[1]
+        return json.loads(_decompress(frame, codec))
+
+
+def _migrate_legacy_json(store: RecordStore, path: str, url_key: Optional[str] = None):
+    """Import a legacy indented-JSON file into the store once, then move it aside."""
+    if not os.path.exists(path):
+        return
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning("Could not migrate %s: %s", path, e)
+        return
+    for record in data if isinstance(data, list) else [data]:
+        store.append(record, url=record.get(url_key) if url_key else None)
+    os.replace(path, path + ".migrated")
+    logger.info("Migrated %s into %s", path, store.directory)
+
+
+def _backfill(store: RecordStore, kind: str, indexer):
+    from utils.history_index import backfill
+    try:
+        backfill(kind, store, indexer)
+    except Exception as e:
+        logger.warning("Could not backfill the %s history index: %s", kind, e)
+
+
+# Shared stores, built once per process under _stores_lock so that concurrent
+# first callers can't both run the legacy migration
+_stores: Dict[str, RecordStore] = {}
+_stores_lock = threading.Lock()
+
+
+def posts_store() -> RecordStore:
+    """History of every saved or published post (formerly generated_posts.json)."""
+    with _stores_lock:
+        if "posts" not in _stores:
+            from utils.history_index import index_post
+            store = RecordStore(os.path.join(DATA_DIR, "posts"))
+            store.listeners.append(index_post)
+            _migrate_legacy_json(store, os.path.join(DATA_DIR, "generated_posts.json"))
+            _backfill(store, "post", index_post)
+            _stores["posts"] = store
+        return _stores["posts"]
+
+
+def articles_store() -> RecordStore:
+    """History of extracted articles, addressable by url (formerly extracted_content.json)."""
+    with _stores_lock:
+        if "articles" not in _stores:
+            from utils.history_index import index_article
+            store = RecordStore(os.path.join(DATA_DIR, "articles"))
+            store.listeners.append(index_article)
+            _migrate_legacy_json(store, os.path.join(DATA_DIR, "extracted_content.json"), url_key="url")
+            _backfill(store, "article", index_article)
+            _stores["articles"] = store
+        return _stores["articles"]